@@ -0,0 +1,10 @@
+import os
+
+# gunicorn -c gunicorn.conf.py main:app
+# Each worker runs its own lifespan, so the pooled httpx client and the
+# registry/result caches are per worker.
+bind = os.getenv("BIND", "0.0.0.0:9001")
+workers = int(os.getenv("WEB_CONCURRENCY", max(2, os.cpu_count() or 1)))
+worker_class = "uvicorn_worker.UvicornWorker"
+keepalive = 75
+timeout = 240
@@ -1,15 +1,92 @@
 import os
+import re
+import email.message
+import json
+import time
+import logging
+import reprlib
+import asyncio
+import hashlib
+import functools
 import httpx
-from typing import List, Dict, Any
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import orjson
+from collections import ChainMap
+from contextlib import asynccontextmanager
+from typing import Annotated, List, Dict, Any, AsyncIterator, Awaitable, Callable, NamedTuple, Optional, Tuple
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 from dotenv import load_dotenv
 
 load_dotenv()
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logger = logging.getLogger("lowcode_backend")
+
+# Bounded repr for debug logs so large candidate lists are not stringified in full
+_short_repr = reprlib.Repr()
+_short_repr.maxstring = 500
+_short_repr.maxother = 500
+_short_repr.maxlist = 5
+_short_repr.maxdict = 20
+
 A2A_REGISTRY_URL = os.getenv("A2A_REGISTRY_URL", "http://localhost:8104/a2a")
-print("📡 Loaded A2A_REGISTRY_URL =", A2A_REGISTRY_URL)
+REGISTRY_CACHE_TTL = float(os.getenv("REGISTRY_CACHE_TTL", "30"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+# Results of nodes marked cacheable are reused for identical (url, method, params) calls
+A2A_RESULT_CACHE_TTL = float(os.getenv("A2A_RESULT_CACHE_TTL", "300"))
+A2A_RESULT_CACHE_MAX = int(os.getenv("A2A_RESULT_CACHE_MAX", "10000"))
+# Agent calls use the client's default timeout; only registry lookups override it
+A2A_TIMEOUT = httpx.Timeout(10.0)
+REGISTRY_TIMEOUT = httpx.Timeout(5.0)
+# Keep below HTTP_MAX_CONNECTIONS so registry lookups still get a connection
+A2A_CONCURRENCY = int(os.getenv("A2A_CONCURRENCY", "32"))
+if A2A_CONCURRENCY >= HTTP_MAX_CONNECTIONS:
+    logger.warning(
+        "A2A_CONCURRENCY=%d is not below HTTP_MAX_CONNECTIONS=%d; clamping to %d",
+        A2A_CONCURRENCY, HTTP_MAX_CONNECTIONS, max(1, HTTP_MAX_CONNECTIONS - 1),
+    )
+    A2A_CONCURRENCY = max(1, HTTP_MAX_CONNECTIONS - 1)
+# Workflows in one /api/run_workflows body all start at once, so cap how many a request may carry
+RUN_WORKFLOWS_MAX_BATCH = int(os.getenv("RUN_WORKFLOWS_MAX_BATCH", "100"))
+logger.info("📡 Loaded A2A_REGISTRY_URL = %s", A2A_REGISTRY_URL)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client per worker so chained A2A calls reuse keep-alive connections
+    app.state.http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            max_connections=HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=30,
+        ),
+        timeout=A2A_TIMEOUT,
+    )
+    app.state.a2a_sem = asyncio.Semaphore(A2A_CONCURRENCY)
+    try:
+        yield
+    finally:
+        await app.state.http_client.aclose()
+
+app = FastAPI(title="LowCode Backend", lifespan=lifespan)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+@app.exception_handler(Exception)
+async def internal_error_handler(request: Request, exc: Exception):
+    # Uvicorn logs the traceback; HTTPExceptions never reach this handler
+    return JSONResponse(status_code=500, content={"detail": f"Internal error: {exc}"})
+
+# Endpoints take the worker's client and semaphore as dependencies, so tests can swap them
+# through app.dependency_overrides (e.g. a client on httpx.MockTransport)
+async def get_http(request: Request) -> httpx.AsyncClient:
+    return request.app.state.http_client
 
-app = FastAPI(title="LowCode Backend")
+async def get_a2a_sem(request: Request) -> asyncio.Semaphore:
+    return request.app.state.a2a_sem
 
 class WorkflowNode(BaseModel):
     id: str
@@ -17,6 +94,7 @@ class WorkflowNode(BaseModel):
     method: str
     inputs: Dict[str, Any] = {}
     next: str = ""
+    cacheable: bool = False
 
 class WorkflowRequest(BaseModel):
     nodes: List[WorkflowNode]
@@ -32,112 +110,346 @@ class ExecutionLog(BaseModel):
 class WorkflowResponse(BaseModel):
     logs: List[ExecutionLog]
 
-async def a2a_call(agent_url: str, method: str, params: dict) -> Any:
-    payload = {
-        "jsonrpc": "2.0",
-        "method": method,
-        "params": params,
-        "id": 1
-    }
-    timeout = 10.0
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(agent_url, json=payload, timeout=timeout)
-        resp.raise_for_status()
-        data = resp.json()
-        if "error" in data:
-            raise HTTPException(status_code=500, detail=f"A2A Error: {data['error']}")
-        return data.get("result")
+class WorkflowResult(BaseModel):
+    status: str
+    logs: List[ExecutionLog] = []
+    detail: Optional[str] = None
+
+WORKFLOW_REQUEST_ADAPTER = TypeAdapter(WorkflowRequest)
+WORKFLOW_BATCH_ADAPTER = TypeAdapter(Annotated[List[WorkflowRequest], Field(max_length=RUN_WORKFLOWS_MAX_BATCH)])
+
+def _is_json_content_type(content_type: Optional[str]) -> bool:
+    # Same rule as FastAPI's own body parsing: application/json or application/*+json only
+    if not content_type:
+        return False
+    message = email.message.Message()
+    message["content-type"] = content_type
+    if message.get_content_maintype() != "application":
+        return False
+    subtype = message.get_content_subtype()
+    return subtype == "json" or subtype.endswith("+json")
+
+async def _validate_body(adapter: TypeAdapter, request: Request) -> Any:
+    body = await request.body()
+    try:
+        if not _is_json_content_type(request.headers.get("content-type")):
+            # As in FastAPI, a body not declared as JSON is validated as raw bytes and always fails.
+            # Otherwise a cross-site text/plain form post could start workflows without a CORS preflight.
+            return adapter.validate_python(body)
+        # Validate the raw bytes in one pydantic-core pass instead of json.loads + model validation
+        return adapter.validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError([_body_error(err) for err in e.errors(include_url=False)])
+
+def _body_error(err: dict) -> dict:
+    err = {**err, "loc": ("body", *err["loc"])}
+    if isinstance(err.get("input"), bytes):
+        # FastAPI's 422 handler JSON-encodes the input and fails on raw bytes (e.g. invalid UTF-8)
+        err["input"] = err["input"].decode("utf-8", "replace")
+    return err
+
+async def _workflow_request(request: Request) -> WorkflowRequest:
+    return await _validate_body(WORKFLOW_REQUEST_ADAPTER, request)
+
+async def _workflow_batch(request: Request) -> List[WorkflowRequest]:
+    return await _validate_body(WORKFLOW_BATCH_ADAPTER, request)
+
+def _openapi_body(adapter: TypeAdapter) -> dict:
+    # Bodies read through a dependency are invisible to FastAPI, so describe them for /docs
+    schema = adapter.json_schema()
+    defs = schema.pop("$defs", {})
+
+    def inline(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return inline(defs[node["$ref"].rsplit("/", 1)[-1]])
+            return {k: inline(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [inline(v) for v in node]
+        return node
+
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": inline(schema)}}}}
+
+# Only what planning needs is kept, so the registry cache does not hold whole raw cards
+class AgentInfo(NamedTuple):
+    params_by_method: Dict[str, tuple]
+    url: Optional[str]
+
+# orjson only handles 64-bit integers: it rejects wider ones when encoding and reads them back as
+# floats. Those values are rare, so they take the stdlib json path, which keeps them exact.
+_WIDE_INT = re.compile(rb"\d{19,}")
+
+def _dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+    except TypeError:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys).encode()
+
+def _loads(raw: bytes) -> Any:
+    # 19+ digits may not fit in 64 bits; the check is a C-level scan and rarely matches
+    if _WIDE_INT.search(raw):
+        return json.loads(raw)
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        # stdlib json also accepts NaN/Infinity, which some agents emit; real syntax errors still raise
+        return json.loads(raw)
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+_JSONRPC_PREFIX = b'{"jsonrpc":"2.0","id":1,"method":'
+
+@functools.lru_cache(maxsize=1024)
+def _jsonrpc_head(method: str) -> bytes:
+    # Everything up to the params is fixed per method name, so encode it once
+    return _JSONRPC_PREFIX + orjson.dumps(method) + b',"params":'
+
+def _encode_jsonrpc(method: str, params: dict) -> bytes:
+    # Splice the fixed envelope around the encoded params instead of building a payload dict
+    return _jsonrpc_head(method) + _dumps(params) + b"}"
+
+async def _post_jsonrpc(client: httpx.AsyncClient, url: str, method: str, params: dict, timeout=httpx.USE_CLIENT_DEFAULT) -> dict:
+    resp = await client.post(url, content=_encode_jsonrpc(method, params), headers=JSON_HEADERS, timeout=timeout)
+    resp.raise_for_status()
+    return _loads(resp.content)
+
+async def a2a_call(client: httpx.AsyncClient, sem: asyncio.Semaphore, agent_url: str, method: str, params: dict) -> Any:
+    async with sem:
+        data = await _post_jsonrpc(client, agent_url, method, params)
+    if "error" in data:
+        raise HTTPException(status_code=500, detail=f"A2A Error: {data['error']}")
+    return data.get("result")
+
+def _single_flight(inflight: Dict[Any, asyncio.Task], key: Any, fetch_fn: Callable[[], Awaitable[Any]]) -> Awaitable[Any]:
+    # Concurrent callers for the same key share one task, so they all get its result or its exception.
+    # The entry is dropped as soon as the task finishes, so the map only holds calls in progress.
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch_fn())
+        inflight[key] = task
+
+        def done(t: asyncio.Task):
+            if inflight.get(key) is t:
+                del inflight[key]
+            if not t.cancelled():
+                t.exception()  # mark retrieved in case every waiter was cancelled
+
+        task.add_done_callback(done)
+    # Shield so one cancelled waiter (e.g. a disconnected client) does not cancel the others
+    return asyncio.shield(task)
+
+_result_cache: Dict[bytes, Tuple[float, Any]] = {}
+_result_inflight: Dict[bytes, asyncio.Task] = {}
+
+async def cached_a2a_call(client: httpx.AsyncClient, sem: asyncio.Semaphore, agent_url: str, method: str, params: dict) -> Any:
+    key = hashlib.blake2b(
+        _dumps([agent_url, method, params], sort_keys=True), digest_size=16
+    ).digest()
+    hit = _result_cache.pop(key, None)
+    if hit and time.monotonic() - hit[0] < A2A_RESULT_CACHE_TTL:
+        _result_cache[key] = hit
+        return hit[1]
+
+    async def call_and_store():
+        result = await a2a_call(client, sem, agent_url, method, params)
+        _result_cache[key] = (time.monotonic(), result)
+        if len(_result_cache) > A2A_RESULT_CACHE_MAX:
+            # Dicts keep insertion order, and hits are re-inserted, so the first key is least recently used
+            del _result_cache[next(iter(_result_cache))]
+        return result
+
+    # Identical concurrent calls (e.g. across a batch) share one agent request
+    return await _single_flight(_result_inflight, key, call_and_store)
+
+# Registry lookups change rarely; cache them per worker for REGISTRY_CACHE_TTL seconds
+_registry_cache: Dict[Tuple, Tuple[float, Any]] = {}
+_registry_inflight: Dict[Tuple, asyncio.Task] = {}
+
+async def _cached(key: Tuple, ttl: float, fetch_fn: Callable[[], Awaitable[Any]]) -> Any:
+    hit = _registry_cache.get(key)
+    if hit and time.monotonic() - hit[0] < ttl:
+        return hit[1]
+
+    async def fetch_and_store():
+        value = await fetch_fn()
+        _registry_cache[key] = (time.monotonic(), value)
+        return value
+
+    return await _single_flight(_registry_inflight, key, fetch_and_store)
+
+def invalidate_registry_cache(key: Optional[Tuple] = None):
+    if key is None:
+        _registry_cache.clear()
+    else:
+        _registry_cache.pop(key, None)
+
+async def _list_agents_body(client: httpx.AsyncClient) -> bytes:
+    reg_data = await _post_jsonrpc(client, A2A_REGISTRY_URL, "list_agents", {}, REGISTRY_TIMEOUT)
+    if "error" in reg_data:
+        raise HTTPException(status_code=500, detail=f"Registry error: {reg_data['error']}")
+    # Registry cards are plain JSON; encode once per refresh and serve the bytes until the TTL expires
+    return _dumps(reg_data.get("result", []))
 
 @app.get("/api/agents")
-async def get_agents():
-    reg_payload = {
-        "jsonrpc": "2.0",
-        "method": "list_agents",
-        "params": {},
-        "id": 1
-    }
+async def get_agents(refresh: bool = False, client: httpx.AsyncClient = Depends(get_http)):
+    if refresh:
+        invalidate_registry_cache()
     try:
-        async with httpx.AsyncClient() as client:
-            reg_resp = await client.post(A2A_REGISTRY_URL, json=reg_payload, timeout=5.0)
-            reg_resp.raise_for_status()
-            reg_data = reg_resp.json()
-            if "error" in reg_data:
-                raise HTTPException(status_code=500, detail=f"Registry error: {reg_data['error']}")
-            agents_list = reg_data.get("result", [])
-            return agents_list
+        body = await _cached(("list_agents",), REGISTRY_CACHE_TTL, lambda: _list_agents_body(client))
+        return Response(content=body, media_type="application/json")
     except httpx.RequestError as e:
         raise HTTPException(status_code=500, detail=f"Failed to reach registry: {e}")
 
-@app.post("/api/run_workflow", response_model=WorkflowResponse)
-async def run_workflow(req: WorkflowRequest):
-    try:
-        node_map = {n.id: n for n in req.nodes}
-        if req.startNodeId not in node_map:
-            raise HTTPException(status_code=400, detail=f"Start node '{req.startNodeId}' not found.")
+async def _plan_workflow(client: httpx.AsyncClient, req: WorkflowRequest) -> List[Tuple[WorkflowNode, str, tuple]]:
+    node_map = {n.id: n for n in req.nodes}
+    if req.startNodeId not in node_map:
+        raise HTTPException(status_code=400, detail=f"Start node '{req.startNodeId}' not found.")
+
+    order = _execution_order(node_map, req.startNodeId)
 
-        logs = []
-        current_node_id = req.startNodeId
-        global_state = {}
+    # Fetch each distinct agent card once, concurrently, before running any node
+    agent_names = list({n.agent for n in order})
+    cards = await asyncio.gather(*(_get_agent_card(client, name) for name in agent_names))
+    card_cache = dict(zip(agent_names, cards))
+    for name, info in card_cache.items():
+        if not info.url:
+            raise HTTPException(status_code=500, detail=f"No valid URL found for agent '{name}'")
+    return [(n, card_cache[n.agent].url, card_cache[n.agent].params_by_method.get(n.method, ())) for n in order]
 
-        while current_node_id:
-            node = node_map[current_node_id]
-            agent_card = await _get_agent_card(node.agent)
-            expected = get_expected_params(agent_card, node.method)
+async def _execute_plan(
+    client: httpx.AsyncClient, sem: asyncio.Semaphore, plan: List[Tuple[WorkflowNode, str, tuple]]
+) -> AsyncIterator[dict]:
+    global_state = {}
 
-            # Merge inputs + global state and filter to what this method accepts
-            merged_params = {
-                k: v for k, v in {**global_state, **node.inputs}.items() if k in expected
-            }
+    for node, url, expected in plan:
+        # Layer inputs over global state and pick only what this method accepts
+        merged = ChainMap(node.inputs, global_state)
+        merged_params = {k: merged[k] for k in expected if k in merged}
 
-            url = agent_card.get("url_ext") or agent_card.get("url")            
-            if not url:
-                raise HTTPException(status_code=500, detail=f"No valid URL found for agent '{node.agent}'")
-            print(f"🚀 Calling {node.agent}.{node.method} → {url} with:", merged_params)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🚀 Calling %s.%s → %s with: %s", node.agent, node.method, url, _short_repr.repr(merged_params))
 
-            output = await a2a_call(url, node.method, merged_params)
-            if isinstance(output, dict):
-                global_state.update(output)
+        call = cached_a2a_call if node.cacheable else a2a_call
+        try:
+            output = await call(client, sem, url, node.method, merged_params)
+        except (httpx.HTTPStatusError, httpx.ConnectError):
+            # The cached card may point at a moved or removed agent; look it up again next run
+            invalidate_registry_cache(("get_agent", node.agent))
+            raise
+        if isinstance(output, dict):
+            global_state.update(output)
 
-            logs.append(ExecutionLog(
-                nodeId=node.id,
-                agent=node.agent,
-                method=node.method,
-                inputs=node.inputs,
-                output=output
-            ))
+        # Plain dicts of already-JSON data; endpoints encode them with orjson without re-validating
+        yield {
+            "nodeId": node.id,
+            "agent": node.agent,
+            "method": node.method,
+            "inputs": node.inputs,
+            "output": output
+        }
 
-            current_node_id = node.next if node.next else None
+@app.post(
+    "/api/run_workflow",
+    responses={200: {"model": WorkflowResponse}},
+    openapi_extra=_openapi_body(WORKFLOW_REQUEST_ADAPTER),
+)
+async def run_workflow(
+    req: WorkflowRequest = Depends(_workflow_request),
+    client: httpx.AsyncClient = Depends(get_http),
+    sem: asyncio.Semaphore = Depends(get_a2a_sem),
+):
+    logs = await _run_workflow_core(client, sem, req)
+    # Skip response_model: the logs are plain JSON, so re-validating them only costs time on large outputs
+    return Response(content=_dumps({"logs": logs}), media_type="application/json")
 
-        return WorkflowResponse(logs=logs)
+async def _run_workflow_core(client: httpx.AsyncClient, sem: asyncio.Semaphore, req: WorkflowRequest) -> List[dict]:
+    plan = await _plan_workflow(client, req)
+    return [log async for log in _execute_plan(client, sem, plan)]
 
+async def _run_batch_item(client: httpx.AsyncClient, sem: asyncio.Semaphore, req: WorkflowRequest) -> dict:
+    # One failing workflow is reported in its own slot instead of failing the whole batch
+    try:
+        return {"status": "ok", "logs": await _run_workflow_core(client, sem, req), "detail": None}
+    except HTTPException as e:
+        return {"status": "error", "logs": [], "detail": str(e.detail)}
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+        logger.exception("Batched workflow execution failed")
+        return {"status": "error", "logs": [], "detail": f"Internal error: {str(e)}"}
+
+@app.post(
+    "/api/run_workflows",
+    responses={200: {"model": List[WorkflowResult]}},
+    openapi_extra=_openapi_body(WORKFLOW_BATCH_ADAPTER),
+)
+async def run_workflows(
+    reqs: List[WorkflowRequest] = Depends(_workflow_batch),
+    client: httpx.AsyncClient = Depends(get_http),
+    sem: asyncio.Semaphore = Depends(get_a2a_sem),
+):
+    # Workflows share the registry cache, client pool and A2A semaphore, so card lookups coalesce
+    results = await asyncio.gather(*(_run_batch_item(client, sem, r) for r in reqs))
+    return Response(content=_dumps(results), media_type="application/json")
+
+def _sse(event: str, data: Any) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + _dumps(data) + b"\n\n"
 
-def get_expected_params(agent_card: dict, method: str):
+@app.post("/api/run_workflow/stream", openapi_extra=_openapi_body(WORKFLOW_REQUEST_ADAPTER))
+async def run_workflow_stream(
+    req: WorkflowRequest = Depends(_workflow_request),
+    client: httpx.AsyncClient = Depends(get_http),
+    sem: asyncio.Semaphore = Depends(get_a2a_sem),
+):
+    # Plan before streaming so bad graphs and unknown agents still get a proper status code
+    plan = await _plan_workflow(client, req)
+
+    async def events():
+        try:
+            async for log in _execute_plan(client, sem, plan):
+                yield _sse("node", log)
+            yield _sse("done", {"status": "ok"})
+        except HTTPException as e:
+            yield _sse("error", {"detail": e.detail})
+        except Exception as e:
+            logger.exception("Workflow execution failed")
+            yield _sse("error", {"detail": f"Internal error: {str(e)}"})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+def index_method_params(agent_card: dict) -> Dict[str, tuple]:
+    params_by_method = {}
     for m in agent_card.get("methods", []):
-        if m["name"] == method:
-            return [p["name"] for p in m.get("params", [])]
-    return []
-
-async def _get_agent_card(agent_name: str) -> dict:
-    payload = {
-        "jsonrpc": "2.0",
-        "method": "get_agent",
-        "params": {"name": agent_name},
-        "id": 1
-    }
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(A2A_REGISTRY_URL, json=payload, timeout=5.0)
-        resp.raise_for_status()
-        data = resp.json()
-        if "error" in data:
-            raise HTTPException(status_code=500, detail=f"Registry agent lookup error: {data['error']}")
-        agent_card = data.get("result", {})
-        if not agent_card:
-            raise HTTPException(status_code=404, detail=f"Agent '{agent_name}' not found.")
-        return agent_card
+        # First definition wins, as the old linear scan did
+        params_by_method.setdefault(m["name"], tuple(dict.fromkeys(p["name"] for p in m.get("params", []))))
+    return params_by_method
+
+def _execution_order(node_map: Dict[str, WorkflowNode], start_node_id: str) -> List[WorkflowNode]:
+    order = []
+    seen = set()
+    current_node_id = start_node_id
+    while current_node_id:
+        if current_node_id not in node_map:
+            raise HTTPException(status_code=400, detail=f"Node '{current_node_id}' not found.")
+        if current_node_id in seen:
+            raise HTTPException(status_code=400, detail=f"Workflow has a cycle at node '{current_node_id}'.")
+        seen.add(current_node_id)
+        node = node_map[current_node_id]
+        order.append(node)
+        current_node_id = node.next
+    return order
+
+async def _get_agent_card(client: httpx.AsyncClient, agent_name: str) -> AgentInfo:
+    return await _cached(("get_agent", agent_name), REGISTRY_CACHE_TTL, lambda: _fetch_agent_card(client, agent_name))
+
+async def _fetch_agent_card(client: httpx.AsyncClient, agent_name: str) -> AgentInfo:
+    data = await _post_jsonrpc(client, A2A_REGISTRY_URL, "get_agent", {"name": agent_name}, REGISTRY_TIMEOUT)
+    if "error" in data:
+        raise HTTPException(status_code=500, detail=f"Registry agent lookup error: {data['error']}")
+    agent_card = data.get("result", {})
+    if not agent_card:
+        raise HTTPException(status_code=404, detail=f"Agent '{agent_name}' not found.")
+    url = agent_card.get("url_ext") or agent_card.get("url")
+    if not url:
+        logger.warning("Agent '%s' has no url_ext or url in the registry", agent_name)
+    return AgentInfo(index_method_params(agent_card), url)
 
 @app.get("/health")
 async def health():
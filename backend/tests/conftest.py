@@ -0,0 +1,79 @@
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+AGENT_BASE = "http://agents.test"
+
+class FakeA2A:
+    """Registry and agents served from one httpx.MockTransport handler."""
+
+    def __init__(self):
+        self.cards = {
+            "auth_agent": {
+                "name": "auth_agent",
+                "url_ext": f"{AGENT_BASE}/auth_agent",
+                "methods": [{"name": "login", "params": [{"name": "username"}, {"name": "password"}]}],
+            },
+            "search_agent": {
+                "name": "search_agent",
+                "url": f"{AGENT_BASE}/search_agent",
+                "methods": [
+                    {"name": "search", "params": [{"name": "title"}, {"name": "token"}]},
+                    {"name": "echo", "params": [{"name": "value"}]},
+                    {"name": "nan", "params": []},
+                ],
+            },
+        }
+        self.calls = []
+        self.status = {}
+
+    def agent_calls(self, name=None):
+        return [c for c in self.calls if c[0] != "registry" and (name is None or c[0] == name)]
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        # stdlib json on the fake side so integers of any width round-trip exactly
+        body = json.loads(request.content)
+        method, params = body["method"], body["params"]
+        if str(request.url) == main.A2A_REGISTRY_URL:
+            self.calls.append(("registry", method, params))
+            if method == "list_agents":
+                return self._reply(list(self.cards.values()))
+            return self._reply(self.cards.get(params["name"], {}))
+
+        name = request.url.path.rsplit("/", 1)[-1]
+        self.calls.append((name, method, params))
+        if name in self.status:
+            return httpx.Response(self.status[name])
+        if method == "login":
+            return self._reply({"success": True, "token": f"tok-{params['username']}"})
+        if method == "search":
+            return self._reply([{"name": "c0", "title": params["title"], "token": params.get("token")}])
+        if method == "echo":
+            return self._reply(params)
+        if method == "nan":
+            return self._reply({"v": float("nan"), "w": float("inf")})
+        return httpx.Response(200, content=json.dumps({"jsonrpc": "2.0", "id": 1, "error": "unknown method"}))
+
+    @staticmethod
+    def _reply(result) -> httpx.Response:
+        return httpx.Response(200, content=json.dumps({"jsonrpc": "2.0", "id": 1, "result": result}))
+
+@pytest.fixture
+def a2a():
+    return FakeA2A()
+
+@pytest.fixture
+def client(a2a):
+    main.invalidate_registry_cache()
+    main._result_cache.clear()
+    http = httpx.AsyncClient(transport=httpx.MockTransport(a2a.handler))
+    main.app.dependency_overrides[main.get_http] = lambda: http
+    try:
+        with TestClient(main.app, raise_server_exceptions=False) as c:
+            yield c
+    finally:
+        main.app.dependency_overrides.clear()
@@ -0,0 +1,78 @@
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+import main
+
+def test_registry_misses_share_one_failing_fetch():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("registry down")
+
+    async def run():
+        main.invalidate_registry_cache()
+        return await asyncio.gather(
+            *(main._cached(("get_agent", "x"), 30, fetch) for _ in range(10)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert main._registry_inflight == {}
+    assert ("get_agent", "x") not in main._registry_cache
+
+def test_registry_inflight_map_does_not_grow_with_distinct_keys():
+    async def fetch():
+        return {}
+
+    async def run():
+        main.invalidate_registry_cache()
+        for i in range(100):
+            await main._cached(("get_agent", f"unknown-{i}"), 30, fetch)
+
+    asyncio.run(run())
+    assert main._registry_inflight == {}
+
+def test_cancelled_waiter_does_not_cancel_shared_fetch():
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "card"
+
+    async def run():
+        main.invalidate_registry_cache()
+        first = asyncio.ensure_future(main._cached(("get_agent", "y"), 30, fetch))
+        second = asyncio.ensure_future(main._cached(("get_agent", "y"), 30, fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "card"
+
+def test_identical_cacheable_calls_share_one_agent_request():
+    calls = 0
+
+    async def handler(request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, content=orjson.dumps({"jsonrpc": "2.0", "id": 1, "result": {"ok": True}}))
+
+    async def run():
+        main._result_cache.clear()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            sem = asyncio.Semaphore(4)
+            return await asyncio.gather(
+                *(main.cached_a2a_call(client, sem, "http://agent.test/a2a", "m", {"a": 1}) for _ in range(5))
+            )
+
+    assert asyncio.run(run()) == [{"ok": True}] * 5
+    assert calls == 1
+    assert main._result_inflight == {}
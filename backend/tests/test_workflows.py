@@ -0,0 +1,155 @@
+import orjson
+import pytest
+
+import main
+
+def workflow(start="n1", **overrides):
+    nodes = [
+        {"id": "n1", "agent": "auth_agent", "method": "login",
+         "inputs": {"username": "admin", "password": "secret", "junk": 1}, "next": "n2"},
+        {"id": "n2", "agent": "search_agent", "method": "search", "inputs": {"title": "dev"}},
+    ]
+    for node in nodes:
+        node.update(overrides.get(node["id"], {}))
+    return {"startNodeId": start, "nodes": nodes}
+
+def sse_events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), orjson.loads(data.removeprefix("data: "))))
+    return events
+
+def test_chain_run_feeds_outputs_into_next_node(client, a2a):
+    r = client.post("/api/run_workflow", json=workflow())
+    assert r.status_code == 200
+    logs = r.json()["logs"]
+    assert [log["nodeId"] for log in logs] == ["n1", "n2"]
+    assert logs[1]["output"] == [{"name": "c0", "title": "dev", "token": "tok-admin"}]
+    # Only declared params are sent; the token comes from the previous node's output
+    assert a2a.agent_calls() == [
+        ("auth_agent", "login", {"username": "admin", "password": "secret"}),
+        ("search_agent", "search", {"title": "dev", "token": "tok-admin"}),
+    ]
+
+def test_missing_start_node_is_400(client):
+    r = client.post("/api/run_workflow", json=workflow(start="zz"))
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Start node 'zz' not found."
+
+def test_missing_next_node_is_400(client, a2a):
+    r = client.post("/api/run_workflow", json=workflow(n2={"next": "n3"}))
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Node 'n3' not found."
+    assert a2a.calls == []
+
+def test_cycle_is_400(client, a2a):
+    r = client.post("/api/run_workflow", json=workflow(n2={"next": "n1"}))
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Workflow has a cycle at node 'n1'."
+    assert a2a.calls == []
+
+def test_batch_reports_errors_per_item(client):
+    r = client.post("/api/run_workflows", json=[workflow(), workflow(start="zz"), workflow()])
+    assert r.status_code == 200
+    results = r.json()
+    assert [res["status"] for res in results] == ["ok", "error", "ok"]
+    assert results[1] == {"status": "error", "logs": [], "detail": "Start node 'zz' not found."}
+    assert [log["nodeId"] for log in results[2]["logs"]] == ["n1", "n2"]
+
+def test_batch_shares_agent_card_lookups(client, a2a):
+    client.post("/api/run_workflows", json=[workflow() for _ in range(5)])
+    lookups = [c for c in a2a.calls if c[:2] == ("registry", "get_agent")]
+    assert len(lookups) == 2
+
+def test_stream_event_sequence(client):
+    r = client.post("/api/run_workflow/stream", json=workflow())
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    events = sse_events(r.text)
+    assert [e for e, _ in events] == ["node", "node", "done"]
+    assert events[0][1]["nodeId"] == "n1"
+    assert events[2][1] == {"status": "ok"}
+
+def test_stream_reports_agent_error_as_event(client):
+    r = client.post("/api/run_workflow/stream", json=workflow(n2={"method": "nope"}))
+    events = sse_events(r.text)
+    assert [e for e, _ in events] == ["node", "error"]
+    assert events[1][1] == {"detail": "A2A Error: unknown method"}
+
+def test_stream_plans_before_streaming(client):
+    r = client.post("/api/run_workflow/stream", json=workflow(n2={"next": "n1"}))
+    assert r.status_code == 400
+
+def test_cacheable_node_reuses_result(client, a2a):
+    wf = workflow(n1={"cacheable": True})
+    first = client.post("/api/run_workflow", json=wf).json()
+    second = client.post("/api/run_workflow", json=wf).json()
+    assert first == second
+    assert len(a2a.agent_calls("auth_agent")) == 1
+    assert len(a2a.agent_calls("search_agent")) == 2
+
+def test_agent_http_error_evicts_its_card(client, a2a):
+    a2a.status["search_agent"] = 503
+    r = client.post("/api/run_workflow", json=workflow())
+    assert r.status_code == 500
+    assert ("get_agent", "search_agent") not in main._registry_cache
+    assert ("get_agent", "auth_agent") in main._registry_cache
+
+    del a2a.status["search_agent"]
+    assert client.post("/api/run_workflow", json=workflow()).status_code == 200
+    lookups = [c[2]["name"] for c in a2a.calls if c[:2] == ("registry", "get_agent")]
+    assert sorted(lookups) == ["auth_agent", "search_agent", "search_agent"]
+
+def test_agents_endpoint_uses_cache_until_refresh(client, a2a):
+    assert [a["name"] for a in client.get("/api/agents").json()] == ["auth_agent", "search_agent"]
+    client.get("/api/agents")
+    client.get("/api/agents", params={"refresh": True})
+    assert [c[1] for c in a2a.calls] == ["list_agents", "list_agents"]
+
+def test_integers_wider_than_64_bits_round_trip(client, a2a):
+    wide = 2**70
+    wf = {"startNodeId": "n1", "nodes": [
+        {"id": "n1", "agent": "search_agent", "method": "echo", "inputs": {"value": wide}, "cacheable": True},
+    ]}
+    r = client.post("/api/run_workflow", json=wf)
+    assert r.status_code == 200
+    assert a2a.agent_calls("search_agent") == [("search_agent", "echo", {"value": wide})]
+    assert r.json()["logs"][0]["output"] == {"value": wide}
+    assert isinstance(r.json()["logs"][0]["output"]["value"], int)
+
+def test_nan_and_infinity_in_agent_replies_are_accepted(client):
+    wf = {"startNodeId": "n1", "nodes": [{"id": "n1", "agent": "search_agent", "method": "nan"}]}
+    r = client.post("/api/run_workflow", json=wf)
+    assert r.status_code == 200
+    # Not representable in JSON, so they go out as null
+    assert r.json()["logs"][0]["output"] == {"v": None, "w": None}
+
+def test_batch_over_the_limit_is_422(client, a2a):
+    r = client.post("/api/run_workflows", json=[workflow()] * (main.RUN_WORKFLOWS_MAX_BATCH + 1))
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["type"] == "too_long"
+    assert a2a.calls == []
+
+def test_invalid_utf8_body_is_422(client, a2a):
+    r = client.post("/api/run_workflow", content=b"\xff\xfe", headers={"content-type": "application/json"})
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["loc"][0] == "body"
+    assert a2a.calls == []
+
+@pytest.mark.parametrize("path, body", [
+    ("/api/run_workflow", workflow()),
+    ("/api/run_workflows", [workflow()]),
+    ("/api/run_workflow/stream", workflow()),
+])
+@pytest.mark.parametrize("content_type", ["text/plain", "application/x-www-form-urlencoded", None])
+def test_body_not_sent_as_json_is_422(client, a2a, path, body, content_type):
+    headers = {"content-type": content_type} if content_type else {}
+    r = client.post(path, content=orjson.dumps(body), headers=headers)
+    assert r.status_code == 422
+    assert a2a.calls == []
+
+def test_json_subtypes_are_accepted(client):
+    r = client.post("/api/run_workflow", content=orjson.dumps(workflow()),
+                    headers={"content-type": "application/vnd.api+json; charset=utf-8"})
+    assert r.status_code == 200
@@ -8,15 +8,15 @@ const AgentsPanel = () => {
     fetchAgents();
   }, []);
 
-  const fetchAgents = async () => {
-    const res = await axios.get('/api/agents');
+  const fetchAgents = async (refresh = false) => {
+    const res = await axios.get('/api/agents', { params: refresh ? { refresh: true } : {} });
     setAgents(res.data);
   };
 
   return (
     <div>
       <h3>Marketplace_Agent</h3>
-      <button onClick={fetchAgents}>Refresh</button>
+      <button onClick={() => fetchAgents(true)}>Refresh</button>
 
       {agents.map((agent) => (
         <div key={agent.name} style={{ marginBottom: '1rem' }}>